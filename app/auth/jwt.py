@@ -108,7 +108,8 @@ async def decode_token(
                 headers={"WWW-Authenticate": "Bearer"},
             )
             
-        if await is_blacklisted(payload["jti"]):
+        remaining = payload["exp"] - datetime.now(timezone.utc).timestamp()
+        if await is_blacklisted(payload["jti"], ttl=remaining):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has been revoked",
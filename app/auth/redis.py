@@ -1,24 +1,287 @@
 # app/auth/redis.py
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from fastapi import FastAPI
 from app.core.config import get_settings
 
-settings = get_settings()
+# SET NX EX in one server-side step: replies "OK" if the key was inserted,
+# nil if the JTI was already blacklisted.
+BLACKLIST_SCRIPT = "return redis.call('SET', KEYS[1], '1', 'NX', 'EX', ARGV[1])"
+
+# Key prefix for blacklisted JTIs; keys are built by plain concatenation
+_BL_PREFIX = "blacklist:"
+
+logger = logging.getLogger(__name__)
+
+# Shared client, created by init_redis() during the application lifespan
+_client: Optional[redis.Redis] = None
+_blacklist_script = None
+
+# Blacklist writes made while the background worker runs are queued here and
+# flushed in pipelined batches of up to MAX_BATCH entries.
+MAX_BATCH = 256
+MAX_QUEUED = 10_000
+# Backoff between retries of a failed flush, and how long shutdown waits
+RETRY_BASE_DELAY = 0.1
+RETRY_MAX_DELAY = 5.0
+SHUTDOWN_FLUSH_TIMEOUT = 10.0
+_bg_queue: Optional[asyncio.Queue] = None
+_bg_worker: Optional[asyncio.Task] = None
+# JTIs queued but not yet written, so local checks see revocations at once
+_pending: Set[str] = set()
+
+# Process-local cache of JTIs known *not* to be blacklisted, mapped to the
+# monotonic time at which that answer stops being trusted.
+_NEG_CACHE: Dict[str, float] = {}
+# Bumped on every local revocation; a lookup only caches its negative answer
+# if no revocation happened while it was waiting on Redis.
+_revocations = 0
+
+def _invalidate(jti: str):
+    global _revocations
+    _NEG_CACHE.pop(jti, None)
+    _revocations += 1
+
+def _neg_cache_hit(jti: str) -> bool:
+    expires = _NEG_CACHE.get(jti)
+    if expires is None:
+        return False
+    if expires <= time.monotonic():
+        _NEG_CACHE.pop(jti, None)
+        return False
+    return True
+
+def _neg_cache_store(jti: str, ttl: Optional[float] = None):
+    settings = get_settings()
+    ttl = settings.BLACKLIST_CACHE_TTL if ttl is None else min(ttl, settings.BLACKLIST_CACHE_TTL)
+    if ttl <= 0:
+        return
+    if len(_NEG_CACHE) >= settings.BLACKLIST_CACHE_SIZE:
+        # Drop the oldest entry; insertion order approximates expiry order
+        _NEG_CACHE.pop(next(iter(_NEG_CACHE)), None)
+    _NEG_CACHE[jti] = time.monotonic() + ttl
+
+def _create_client() -> redis.Redis:
+    """
+    Build a client on a bounded, blocking connection pool.
+
+    Replies are left as bytes: the blacklist only reads integers (EXISTS)
+    and nil/OK (the admission script), so decoding would be wasted work.
+    """
+    settings = get_settings()
+    pool = redis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL or "redis://localhost",
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        health_check_interval=30,
+    )
+    return redis.Redis.from_pool(pool)
+
+async def init_redis(app: FastAPI):
+    """
+    Create the shared Redis client at startup and open its first connection.
+
+    The client is stored on ``app.state.redis`` and returned by
+    ``get_redis()``. A failed PING is logged rather than raised, since the
+    blacklist is optional.
+    """
+    global _client, _blacklist_script
+    _client = _create_client()
+    _blacklist_script = None
+    app.state.redis = _client
+    try:
+        await _client.ping()
+    except redis.RedisError:
+        logger.warning("Redis is unreachable at startup; continuing without a warm connection")
+
+async def close_redis(app: FastAPI):
+    """Close the shared Redis client and its connection pool"""
+    global _client, _blacklist_script
+    client = getattr(app.state, "redis", None) or _client
+    _client = None
+    _blacklist_script = None
+    app.state.redis = None
+    if client is not None:
+        await client.aclose()
+
+async def get_redis() -> redis.Redis:
+    """
+    Return the shared Redis client.
+
+    Outside the application lifespan (scripts, tests) a client is created on
+    first use.
+    """
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+async def get_blacklist_script():
+    """
+    Return the registered blacklist admission script.
+
+    Calling the script issues EVALSHA and transparently falls back to
+    loading it when the server replies NOSCRIPT.
+    """
+    global _blacklist_script
+    if _blacklist_script is None:
+        r = await get_redis()
+        _blacklist_script = r.register_script(BLACKLIST_SCRIPT)
+    return _blacklist_script
+
+async def get_pipeline() -> Pipeline:
+    """
+    Return a non-transactional pipeline on the shared client.
+
+    Commands queued on the pipeline are sent in a single write when
+    ``execute()`` is awaited, so related lookups cost one round-trip.
+    """
+    r = await get_redis()
+    return r.pipeline(transaction=False)
+
+async def _admit_to_blacklist(jti: str, exp: int, pipe: Optional[Pipeline] = None):
+    """
+    Run the admission script now, or queue the equivalent SET NX EX on ``pipe``.
+
+    Pipelines get the plain command rather than the script: a script queued
+    on a pipeline makes ``execute()`` send SCRIPT EXISTS first, an extra
+    round-trip, and SET NX EX is already atomic with the same OK/nil reply.
+    """
+    if pipe is not None:
+        return pipe.set(_BL_PREFIX + jti, 1, nx=True, ex=exp)
+    script = await get_blacklist_script()
+    return await script(keys=[_BL_PREFIX + jti], args=[exp]) is not None
+
+async def add_to_blacklist(jti: str, exp: int, pipe: Optional[Pipeline] = None):
+    """
+    Atomically add a token's JTI to the blacklist.
+
+    While the background worker is running the write is handed to it and
+    this returns None immediately. Otherwise, or when the worker's queue is
+    full, the write is awaited and returns True if the JTI was inserted and
+    False if it was already present. If ``pipe`` is given a SET NX EX is
+    only queued on it; the caller is responsible for awaiting
+    ``pipe.execute()``.
+    """
+    _invalidate(jti)
+    if pipe is not None:
+        return await _admit_to_blacklist(jti, exp, pipe=pipe)
+    if _bg_worker is not None and not _bg_worker.done():
+        try:
+            _bg_queue.put_nowait((jti, exp))
+            _pending.add(jti)
+            return None
+        except asyncio.QueueFull:
+            pass
+    return await _admit_to_blacklist(jti, exp)
+
+async def add_many_to_blacklist(tokens: List[Tuple[str, int]]) -> List[bool]:
+    """Blacklist several (jti, exp) pairs in one round-trip"""
+    r = await get_redis()
+    async with r.pipeline(transaction=False) as pipe:
+        for jti, exp in tokens:
+            _invalidate(jti)
+            await _admit_to_blacklist(jti, exp, pipe=pipe)
+        results = await pipe.execute()
+    return [result is not None for result in results]
+
+async def _blacklist_worker():
+    """
+    Drain queued blacklist writes, flushing up to MAX_BATCH per round-trip.
+
+    A failed flush is retried with exponential backoff; its JTIs stay in
+    ``_pending`` (and so keep being rejected locally) until the write lands.
+    """
+    while True:
+        batch = [await _bg_queue.get()]
+        while len(batch) < MAX_BATCH and not _bg_queue.empty():
+            batch.append(_bg_queue.get_nowait())
+        delay = RETRY_BASE_DELAY
+        while True:
+            try:
+                await add_many_to_blacklist(batch)
+                break
+            except Exception:
+                logger.exception(
+                    "Failed to write %d blacklist entries; retrying in %.1fs", len(batch), delay
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+        for jti, _ in batch:
+            _pending.discard(jti)
+            _bg_queue.task_done()
+
+def start_blacklist_worker():
+    """Start the background blacklist writer on the running event loop"""
+    global _bg_queue, _bg_worker
+    if _bg_worker is None or _bg_worker.done():
+        # Created here so the queue belongs to the loop that serves requests
+        _bg_queue = asyncio.Queue(maxsize=MAX_QUEUED)
+        _bg_worker = asyncio.create_task(_blacklist_worker())
+
+async def stop_blacklist_worker():
+    """
+    Flush pending blacklist writes and stop the background writer.
+
+    Waits up to SHUTDOWN_FLUSH_TIMEOUT seconds for the queue to drain; any
+    writes still unconfirmed after that are logged as lost.
+    """
+    global _bg_worker
+    if _bg_worker is None:
+        return
+    if not _bg_worker.done():
+        try:
+            await asyncio.wait_for(_bg_queue.join(), SHUTDOWN_FLUSH_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error("Shutting down with %d blacklist entries unwritten", len(_pending))
+        _bg_worker.cancel()
+    try:
+        await _bg_worker
+    except asyncio.CancelledError:
+        pass
+    _bg_worker = None
 
-async def get_redis():
-    """Return a Redis client singleton"""
-    if not hasattr(get_redis, "redis"):
-        # Create a Redis client
-        get_redis.redis = redis.Redis.from_url(
-            settings.REDIS_URL or "redis://localhost", decode_responses=True
-        )
-    return get_redis.redis
+async def is_blacklisted(
+    jti: str,
+    pipe: Optional[Pipeline] = None,
+    ttl: Optional[float] = None,
+):
+    """
+    Check if a token's JTI is blacklisted.
 
-async def add_to_blacklist(jti: str, exp: int):
-    """Add a token's JTI to the blacklist"""
+    Negative answers are cached in-process for at most
+    ``BLACKLIST_CACHE_TTL`` seconds (or ``ttl``, the token's remaining
+    lifetime, if shorter). If ``pipe`` is given the EXISTS is only queued on
+    it and the pipeline is returned; the matching entry of ``pipe.execute()``
+    is the key count.
+    """
+    if pipe is not None:
+        pipe.exists(_BL_PREFIX + jti)
+        return pipe
+    if jti in _pending:
+        return True
+    if _neg_cache_hit(jti):
+        return False
+    generation = _revocations
     r = await get_redis()
-    await r.set(f"blacklist:{jti}", "1", ex=exp)
+    if await r.exists(_BL_PREFIX + jti) > 0:
+        return True
+    # The reply may predate a revocation made while we were waiting
+    if jti in _pending:
+        return True
+    if generation == _revocations:
+        _neg_cache_store(jti, ttl)
+    return False
 
-async def is_blacklisted(jti: str) -> bool:
-    """Check if a token's JTI is blacklisted"""
+async def check_blacklist_many(jtis: List[str]) -> List[bool]:
+    """Check several JTIs against the blacklist in one round-trip"""
     r = await get_redis()
-    return await r.exists(f"blacklist:{jti}") > 0
+    async with r.pipeline(transaction=False) as pipe:
+        for jti in jtis:
+            pipe.exists(_BL_PREFIX + jti)
+        results = await pipe.execute()
+    return [count > 0 for count in results]
@@ -0,0 +1,48 @@
+# app/core/clock.py
+"""
+Coarse wall clock for non-security timestamps.
+
+A background task refreshes a shared naive-UTC ``datetime`` every
+``TICK_SECONDS`` so hot request paths can read it instead of building a new
+object per call. Anything that must be exact (token expiry) should keep
+calling ``datetime.now()`` directly.
+"""
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+TICK_SECONDS = 0.05
+
+_now: Optional[datetime] = None
+_ticker: Optional[asyncio.Task] = None
+
+def coarse_utcnow() -> datetime:
+    """Return the cached naive UTC time, or the exact time if the ticker is stopped."""
+    if _now is None:
+        return datetime.utcnow()
+    return _now
+
+async def _tick():
+    global _now
+    while True:
+        _now = datetime.utcnow()
+        await asyncio.sleep(TICK_SECONDS)
+
+def start_clock():
+    """Start refreshing the cached time on the running event loop"""
+    global _now, _ticker
+    if _ticker is None or _ticker.done():
+        _now = datetime.utcnow()
+        _ticker = asyncio.create_task(_tick())
+
+async def stop_clock():
+    """Stop the ticker; later reads fall back to the exact time"""
+    global _now, _ticker
+    if _ticker is not None:
+        _ticker.cancel()
+        try:
+            await _ticker
+        except asyncio.CancelledError:
+            pass
+    _now = None
+    _ticker = None
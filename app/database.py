@@ -1,5 +1,7 @@
 # app/database.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -19,6 +21,24 @@ def get_db():
     finally:
         db.close()
 
+# Async engine and sessionmaker for endpoints that run on the event loop.
+# The same PostgreSQL database is reached through the asyncpg driver.
+# Objects stay loaded after commit, so handlers can return them without a
+# refresh SELECT.
+def get_async_database_url(database_url: str = SQLALCHEMY_DATABASE_URL):
+    """Return the asyncpg flavour of a PostgreSQL database URL."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url
+
+async_engine = create_async_engine(get_async_database_url())
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # --- New Functions Added ---
 def get_engine(database_url: str = SQLALCHEMY_DATABASE_URL):
     """Factory function to create a new SQLAlchemy engine."""
@@ -1,9 +1,15 @@
+from sqlalchemy import inspect
 from app.database import engine
 from app.models.user import Base
 
 def init_db():
     Base.metadata.create_all(bind=engine)
 
+def schema_exists(bind=engine) -> bool:
+    """Return True if every mapped table already exists, using one catalog query."""
+    existing = set(inspect(bind).get_table_names())
+    return set(Base.metadata.tables).issubset(existing)
+
 def drop_db():
     Base.metadata.drop_all(bind=engine)
 
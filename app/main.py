@@ -13,27 +13,35 @@ Changes made:
 """
 
 import os
+import re
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
+from typing import List, Optional
 from uuid import UUID
-from typing import List
 
-from fastapi import Body, FastAPI, Depends, HTTPException, status, Request, Form
+import jinja2
+from fastapi import Body, FastAPI, Depends, HTTPException, status, Request, Form, Query
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from sqlalchemy import bindparam, delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 # Use relative imports to avoid import path issues when running tests or as a package
 from .auth.dependencies import get_current_active_user
+from .auth.redis import close_redis, init_redis, start_blacklist_worker, stop_blacklist_worker
 from .models.calculation import Calculation
 from .models.user import User
 from .schemas.calculation import CalculationBase, CalculationResponse, CalculationUpdate
 from .schemas.token import TokenResponse
 from .schemas.user import UserCreate, UserResponse, UserLogin
-from .database import Base, get_db, engine
+from .core.clock import coarse_utcnow, start_clock, stop_clock
+from .core.config import settings
+from .database import Base, async_engine, get_async_db, get_db, engine
+from .database_init import schema_exists
 
 # -------------------------------------------------------------------------
 # Test-mode detection: disable lifespan/startup side-effects when running pytest
@@ -47,17 +55,27 @@ PYTEST_RUNNING = os.getenv("PYTEST_RUNNING", "0") == "1"
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
-    Lifespan context manager that creates DB tables at startup.
+    Lifespan context manager that creates DB tables at startup if missing.
     Disabled while running tests (PYTEST_RUNNING=1).
     """
     # Only create tables when not running under pytest to avoid side-effects
     if not PYTEST_RUNNING:
         # It's useful to keep minimal logging for local runs
-        print("Creating tables...")
-        Base.metadata.create_all(bind=engine)
-        print("Tables created successfully!")
+        if schema_exists(engine):
+            print("Tables already exist, skipping creation.")
+        else:
+            print("Creating tables...")
+            Base.metadata.create_all(bind=engine)
+            print("Tables created successfully!")
+    await init_redis(app)
+    start_blacklist_worker()
+    start_clock()
     yield
-    # (Optional) Add shutdown/cleanup logic here if needed
+    await stop_clock()
+    # Flush queued token revocations before the worker and pool go away
+    await stop_blacklist_worker()
+    await close_redis(app)
+    await async_engine.dispose()
 
 
 # Initialize FastAPI app; disable lifespan when running tests
@@ -66,6 +84,7 @@ app = FastAPI(
     description="API for managing calculations",
     version="1.0.0",
     lifespan=None if PYTEST_RUNNING else lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # -------------------------------------------------------------------------
@@ -73,32 +92,64 @@ app = FastAPI(
 # -------------------------------------------------------------------------
 if not PYTEST_RUNNING:
     app.mount("/static", StaticFiles(directory="static"), name="static")
-    templates = Jinja2Templates(directory="templates")
+    if settings.DEBUG:
+        templates = Jinja2Templates(directory="templates")
+    else:
+        # Templates don't change in production: skip the per-render stat()
+        # and share compiled bytecode between workers and restarts.
+        templates = Jinja2Templates(
+            env=jinja2.Environment(
+                loader=jinja2.FileSystemLoader("templates"),
+                autoescape=True,
+                auto_reload=False,
+                bytecode_cache=jinja2.FileSystemBytecodeCache(),
+            )
+        )
 else:
     templates = None
+app.state.static_html = {}
 
 
 # -------------------------------------------------------------------------
 # Web routes (HTML)
 # -------------------------------------------------------------------------
+# Pages without per-request data are rendered once and served from memory
+# afterwards. They are rendered with a url_for() that returns root-relative
+# paths, so the output doesn't depend on the client's Host header and the
+# cache holds at most one entry per page. DEBUG renders every time so
+# template edits show up.
+STATIC_PAGE_HEADERS = {"cache-control": "public, max-age=300"}
+
+
+def _static_page(request: Request, name: str) -> HTMLResponse:
+    cache = request.app.state.static_html
+    body = None if settings.DEBUG else cache.get(name)
+    if body is None:
+        context = {"request": request, "url_for": request.app.url_path_for}
+        body = templates.get_template(f"{name}.html").render(context).encode()
+        if not settings.DEBUG:
+            cache[name] = body
+    return HTMLResponse(body, headers=STATIC_PAGE_HEADERS)
+
+
 @app.get("/", response_class=HTMLResponse, tags=["web"])
 def read_index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return _static_page(request, "index")
 
 
 @app.get("/login", response_class=HTMLResponse, tags=["web"])
 def login_page(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return _static_page(request, "login")
 
 
 @app.get("/register", response_class=HTMLResponse, tags=["web"])
 def register_page(request: Request):
-    return templates.TemplateResponse("register.html", {"request": request})
+    return _static_page(request, "register")
 
 
 @app.get("/dashboard", response_class=HTMLResponse, tags=["web"])
 def dashboard_page(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    return _static_page(request, "dashboard")
 
 
 @app.get("/dashboard/view/{calc_id}", response_class=HTMLResponse, tags=["web"])
@@ -190,16 +241,52 @@ def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
 # -------------------------------------------------------------------------
 # Calculations endpoints (BREAD)
 # -------------------------------------------------------------------------
+# Canonical 8-4-4-4-12 UUID text; cheaper than UUID() and raises nothing
+_UUID_RE = re.compile(
+    r"\A[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\Z", re.IGNORECASE
+)
+
+# Built once so every ownership lookup reuses SQLAlchemy's compiled-statement cache
+_OWNED_CALC_STMT = select(Calculation).where(
+    Calculation.id == bindparam("cid"), Calculation.user_id == bindparam("uid")
+)
+# Ownership check and removal in one statement; rowcount 0 means not found
+_DELETE_OWNED_CALC_STMT = delete(Calculation).where(
+    Calculation.id == bindparam("cid"), Calculation.user_id == bindparam("uid")
+)
+
+
+def _check_calc_id(calc_id: str):
+    """Reject ids that aren't canonical UUID strings before they reach SQL."""
+    if not _UUID_RE.match(calc_id):
+        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
+
+
+async def _get_owned_calc(db: AsyncSession, calc_id: str, user_id) -> Calculation:
+    """
+    Load a calculation owned by the given user or raise an HTTPException.
+
+    The id is format-checked here and then passed to the database as a
+    string, where the uuid type does the conversion.
+    """
+    _check_calc_id(calc_id)
+    result = await db.execute(_OWNED_CALC_STMT, {"cid": calc_id, "uid": user_id})
+    calculation = result.scalar_one_or_none()
+    if not calculation:
+        raise HTTPException(status_code=404, detail="Calculation not found.")
+    return calculation
+
+
 @app.post(
     "/calculations",
     response_model=CalculationResponse,
     status_code=status.HTTP_201_CREATED,
     tags=["calculations"],
 )
-def create_calculation(
+async def create_calculation(
     calculation_data: CalculationBase,
     current_user=Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
         new_calculation = Calculation.create(
@@ -207,82 +294,110 @@ def create_calculation(
             user_id=current_user.id,
             inputs=calculation_data.inputs,
         )
+        # Runs on the event loop; a sum/product over a short list costs less
+        # than the thread hop run_in_threadpool would add.
         new_calculation.result = new_calculation.get_result()
 
+        # Every column default is Python-side, so the flushed object is
+        # already complete and needs no refresh SELECT after the INSERT.
         db.add(new_calculation)
-        db.commit()
-        db.refresh(new_calculation)
+        await db.commit()
         return new_calculation
 
     except ValueError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @app.get("/calculations", response_model=List[CalculationResponse], tags=["calculations"])
-def list_calculations(current_user=Depends(get_current_active_user), db: Session = Depends(get_db)):
-    calculations = db.query(Calculation).filter(Calculation.user_id == current_user.id).all()
-    return calculations
+async def list_calculations(
+    limit: int = Query(50, ge=1, le=500),
+    after_id: Optional[UUID] = None,
+    current_user=Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    List the current user's calculations, newest first, one page at a time.
 
+    Pages are keyset-paginated on (created_at, id) descending: pass the id of
+    the last calculation of a page as ``after_id`` to fetch the next one. An
+    ``after_id`` that isn't one of the user's calculations is a 404. Only the
+    response columns are selected, so rows never become ORM objects.
+    """
+    stmt = select(
+        Calculation.id,
+        Calculation.user_id,
+        Calculation.type,
+        Calculation.inputs,
+        Calculation.result,
+        Calculation.created_at,
+        Calculation.updated_at,
+    ).where(Calculation.user_id == current_user.id)
+
+    if after_id is not None:
+        cursor_created_at = (
+            await db.execute(
+                select(Calculation.created_at).where(
+                    Calculation.id == after_id, Calculation.user_id == current_user.id
+                )
+            )
+        ).scalar_one_or_none()
+        if cursor_created_at is None:
+            raise HTTPException(status_code=404, detail="Cursor calculation not found.")
+        stmt = stmt.where(
+            tuple_(Calculation.created_at, Calculation.id) < tuple_(cursor_created_at, after_id)
+        )
 
-@app.get("/calculations/{calc_id}", response_model=CalculationResponse, tags=["calculations"])
-def get_calculation(calc_id: str, current_user=Depends(get_current_active_user), db: Session = Depends(get_db)):
-    try:
-        calc_uuid = UUID(calc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
+    stmt = stmt.order_by(Calculation.created_at.desc(), Calculation.id.desc()).limit(limit)
+    rows = (await db.execute(stmt)).all()
+    return [CalculationResponse.model_validate(row) for row in rows]
 
-    calculation = (
-        db.query(Calculation).filter(Calculation.id == calc_uuid, Calculation.user_id == current_user.id).first()
-    )
-    if not calculation:
-        raise HTTPException(status_code=404, detail="Calculation not found.")
+
+@app.get("/calculations/{calc_id}", response_model=CalculationResponse, tags=["calculations"])
+async def get_calculation(
+    calc_id: str,
+    current_user=Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    calculation = await _get_owned_calc(db, calc_id, current_user.id)
     return calculation
 
 
 @app.put("/calculations/{calc_id}", response_model=CalculationResponse, tags=["calculations"])
-def update_calculation(
+async def update_calculation(
     calc_id: str,
     calculation_update: CalculationUpdate,
     current_user=Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    try:
-        calc_uuid = UUID(calc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
-
-    calculation = (
-        db.query(Calculation).filter(Calculation.id == calc_uuid, Calculation.user_id == current_user.id).first()
-    )
-    if not calculation:
-        raise HTTPException(status_code=404, detail="Calculation not found.")
+    calculation = await _get_owned_calc(db, calc_id, current_user.id)
 
     if calculation_update.inputs is not None:
         calculation.inputs = calculation_update.inputs
         calculation.result = calculation.get_result()
 
-    calculation.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(calculation)
+    # The cached clock can lag by a tick; never move updated_at backwards
+    calculation.updated_at = max(coarse_utcnow(), calculation.updated_at)
+    await db.commit()
     return calculation
 
 
 @app.delete("/calculations/{calc_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["calculations"])
-def delete_calculation(calc_id: str, current_user=Depends(get_current_active_user), db: Session = Depends(get_db)):
-    try:
-        calc_uuid = UUID(calc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
-
-    calculation = (
-        db.query(Calculation).filter(Calculation.id == calc_uuid, Calculation.user_id == current_user.id).first()
+async def delete_calculation(
+    calc_id: str,
+    current_user=Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    _check_calc_id(calc_id)
+    result = await db.execute(
+        _DELETE_OWNED_CALC_STMT,
+        {"cid": calc_id, "uid": current_user.id},
+        execution_options={"synchronize_session": False},
     )
-    if not calculation:
+    if not result.rowcount:
         raise HTTPException(status_code=404, detail="Calculation not found.")
 
-    db.delete(calculation)
-    db.commit()
+    await db.commit()
     return None
 
 
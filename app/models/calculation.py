@@ -17,7 +17,7 @@ basic mathematical operations: addition, subtraction, multiplication, and divisi
 from datetime import datetime
 import uuid
 from typing import List
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Float
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Float, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, declared_attr
 from sqlalchemy.ext.declarative import declared_attr
@@ -219,6 +219,12 @@ class Calculation(Base, AbstractCalculation):
     The concrete calculation subclasses (Addition, Subtraction, etc.) will
     inherit from this class and specify their own polymorphic identities.
     """
+    __table_args__ = (
+        # Backs the keyset pagination of GET /calculations: rows for one user
+        # are read in (created_at, id) order without sorting their history.
+        Index("ix_calculations_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
     __mapper_args__ = {
         "polymorphic_on": "type",
         "polymorphic_identity": "calculation",
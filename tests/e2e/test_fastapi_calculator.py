@@ -287,6 +287,59 @@ def test_list_get_update_delete_calculation(base_url: str):
     get_response_after_delete = requests.get(get_url, headers=headers)
     assert get_response_after_delete.status_code == 404, "Expected 404 after deletion"
 
+def test_list_calculations_pagination(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Pager",
+        "email": f"calc.pager{uuid4()}@example.com",
+        "username": f"calc_pager_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    url = f"{base_url}/calculations"
+
+    created_ids = []
+    for inputs in ([1, 1], [2, 2], [3, 3]):
+        response = requests.post(url, json={"type": "addition", "inputs": inputs}, headers=headers)
+        assert response.status_code == 201, f"Calculation creation failed: {response.text}"
+        created_ids.append(response.json()["id"])
+
+    # Newest first, two per page
+    first_page = requests.get(url, params={"limit": 2}, headers=headers)
+    assert first_page.status_code == 200, f"List calculations failed: {first_page.text}"
+    assert [c["id"] for c in first_page.json()] == created_ids[:0:-1]
+
+    # The cursor continues after the last item of the previous page
+    second_page = requests.get(
+        url, params={"limit": 2, "after_id": created_ids[1]}, headers=headers
+    )
+    assert second_page.status_code == 200, f"List calculations failed: {second_page.text}"
+    assert [c["id"] for c in second_page.json()] == created_ids[:1]
+
+    # An unknown cursor is rejected rather than returning an empty page
+    unknown_cursor = requests.get(url, params={"after_id": str(uuid4())}, headers=headers)
+    assert unknown_cursor.status_code == 404, f"Expected 404 for unknown cursor, got {unknown_cursor.status_code}"
+
+def test_calculation_invalid_id_format(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Invalid",
+        "email": f"calc.invalid{uuid4()}@example.com",
+        "username": f"calc_invalid_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    url = f"{base_url}/calculations/not-a-uuid"
+
+    get_response = requests.get(url, headers=headers)
+    assert get_response.status_code == 400, f"Expected 400 for invalid id, got {get_response.status_code}"
+    delete_response = requests.delete(url, headers=headers)
+    assert delete_response.status_code == 400, f"Expected 400 for invalid id, got {delete_response.status_code}"
+
 # ---------------------------------------------------------------------------
 # Direct Model Tests for Calculation Operations
 # ---------------------------------------------------------------------------
@@ -0,0 +1,80 @@
+# tests/unit/test_clock.py
+
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core import clock
+from app.main import update_calculation
+from app.models.calculation import Calculation
+from app.schemas.calculation import CalculationUpdate
+
+
+def test_coarse_utcnow_is_exact_without_ticker():
+    """Without the ticker, coarse_utcnow falls back to the exact time."""
+    before = datetime.utcnow()
+    now = clock.coarse_utcnow()
+    assert before <= now <= datetime.utcnow()
+
+
+def test_coarse_utcnow_serves_cached_value_while_ticking():
+    """While the ticker runs, reads share one cached value that advances per tick."""
+    async def scenario():
+        clock.start_clock()
+        try:
+            first = clock.coarse_utcnow()
+            assert clock.coarse_utcnow() is first
+            await asyncio.sleep(clock.TICK_SECONDS * 3)
+            assert clock.coarse_utcnow() > first
+        finally:
+            await clock.stop_clock()
+
+    asyncio.run(scenario())
+
+
+def test_stop_clock_resets_state():
+    """Stopping the ticker clears the cached value so reads are exact again."""
+    async def scenario():
+        clock.start_clock()
+        await clock.stop_clock()
+
+    asyncio.run(scenario())
+    assert clock._ticker is None
+    assert clock._now is None
+
+
+def test_update_right_after_create_never_moves_updated_at_backwards():
+    """An update within the same tick as the insert keeps updated_at monotonic."""
+    async def scenario():
+        clock.start_clock()
+        try:
+            # Insert defaults call datetime.utcnow() once per column, after
+            # the cached tick was taken, so both stamps run ahead of it.
+            calc = Calculation.create("addition", uuid.uuid4(), [1, 2])
+            time.sleep(0.001)
+            calc.created_at = datetime.utcnow()
+            time.sleep(0.001)
+            calc.updated_at = datetime.utcnow()
+            assert clock.coarse_utcnow() < calc.created_at
+
+            result = MagicMock()
+            result.scalar_one_or_none.return_value = calc
+            db = MagicMock()
+            db.execute = AsyncMock(return_value=result)
+            db.commit = AsyncMock()
+            user = MagicMock(id=calc.user_id)
+
+            stamps = [calc.updated_at]
+            for inputs in ([3, 4], [5, 6]):
+                await update_calculation(
+                    str(uuid.uuid4()), CalculationUpdate(inputs=inputs), current_user=user, db=db
+                )
+                stamps.append(calc.updated_at)
+        finally:
+            await clock.stop_clock()
+        return stamps
+
+    stamps = asyncio.run(scenario())
+    assert stamps == sorted(stamps)
@@ -0,0 +1,109 @@
+# tests/unit/test_redis_blacklist.py
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.auth import redis as blacklist
+
+# Fixture providing a fake Redis client and a clean negative cache
+@pytest.fixture
+def mock_redis():
+    client = AsyncMock()
+    blacklist._NEG_CACHE.clear()
+    with patch.object(blacklist, "get_redis", AsyncMock(return_value=client)):
+        yield client
+    blacklist._NEG_CACHE.clear()
+
+# A negative answer is served from the process cache on the next lookup
+def test_is_blacklisted_caches_negative_result(mock_redis):
+    mock_redis.exists.return_value = 0
+
+    assert asyncio.run(blacklist.is_blacklisted("jti-1")) is False
+    assert asyncio.run(blacklist.is_blacklisted("jti-1")) is False
+
+    mock_redis.exists.assert_awaited_once_with("blacklist:jti-1")
+
+# Positive answers are never cached
+def test_is_blacklisted_does_not_cache_positive_result(mock_redis):
+    mock_redis.exists.return_value = 1
+
+    assert asyncio.run(blacklist.is_blacklisted("jti-2")) is True
+    assert asyncio.run(blacklist.is_blacklisted("jti-2")) is True
+
+    assert mock_redis.exists.await_count == 2
+
+# A token whose remaining lifetime has run out is not cached
+def test_is_blacklisted_skips_cache_for_expired_token(mock_redis):
+    mock_redis.exists.return_value = 0
+
+    asyncio.run(blacklist.is_blacklisted("jti-3", ttl=-1))
+
+    assert "jti-3" not in blacklist._NEG_CACHE
+
+# While the worker runs, revocations are queued and visible immediately
+def test_add_to_blacklist_queues_for_background_worker(mock_redis):
+    async def scenario():
+        with patch.object(blacklist, "add_many_to_blacklist", AsyncMock()) as flush:
+            blacklist.start_blacklist_worker()
+            assert await blacklist.add_to_blacklist("jti-4", 60) is None
+            assert await blacklist.is_blacklisted("jti-4") is True
+            await blacklist.stop_blacklist_worker()
+            flush.assert_awaited_once_with([("jti-4", 60)])
+
+    asyncio.run(scenario())
+    assert "jti-4" not in blacklist._pending
+    mock_redis.exists.assert_not_awaited()
+
+# A revocation landing while EXISTS is in flight must not be cached over
+def test_is_blacklisted_ignores_reply_raced_by_revocation(mock_redis):
+    async def exists_racing_revocation(key):
+        with patch.object(blacklist, "_admit_to_blacklist", AsyncMock(return_value=True)):
+            await blacklist.add_to_blacklist("jti-5", 60)
+        return 0
+
+    mock_redis.exists.side_effect = exists_racing_revocation
+
+    asyncio.run(blacklist.is_blacklisted("jti-5"))
+
+    assert "jti-5" not in blacklist._NEG_CACHE
+
+# A failed flush is retried and the JTI stays revoked until it lands
+def test_blacklist_worker_retries_failed_flush(mock_redis):
+    flush = AsyncMock(side_effect=[ConnectionError("redis down"), None])
+
+    async def scenario():
+        with patch.object(blacklist, "add_many_to_blacklist", flush), \
+                patch.object(blacklist, "RETRY_BASE_DELAY", 0.01):
+            blacklist.start_blacklist_worker()
+            await blacklist.add_to_blacklist("jti-6", 60)
+            while flush.await_count < 1:
+                await asyncio.sleep(0)
+            assert "jti-6" in blacklist._pending
+            assert await blacklist.is_blacklisted("jti-6") is True
+            await blacklist.stop_blacklist_worker()
+
+    asyncio.run(scenario())
+    assert flush.await_count == 2
+    flush.assert_awaited_with([("jti-6", 60)])
+    assert "jti-6" not in blacklist._pending
+
+# Batched revocations queue plain SET NX EX, so no SCRIPT EXISTS precedes the flush
+def test_add_many_to_blacklist_pipelines_plain_set():
+    client = blacklist.redis.Redis()
+    pipe = client.pipeline(transaction=False)
+    sent = []
+
+    async def execute():
+        sent.extend(args[0] for args, _ in pipe.command_stack)
+        assert not pipe.scripts
+        return [True, None]
+
+    pipe.execute = execute
+    client.pipeline = lambda transaction=False: pipe
+
+    with patch.object(blacklist, "get_redis", AsyncMock(return_value=client)):
+        inserted = asyncio.run(blacklist.add_many_to_blacklist([("jti-7", 60), ("jti-8", 60)]))
+
+    assert inserted == [True, False]
+    assert sent == ["SET", "SET"]